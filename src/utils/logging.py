@@ -14,9 +14,11 @@
 # limitations under the License.
 """Logging utilities."""
 
-import functools
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 import threading
 
@@ -33,7 +35,7 @@ from logging import (
 )
 
 from logging import captureWarnings as _captureWarnings
-from typing import Optional
+from typing import Dict, Optional
 
 import huggingface_hub.utils as hf_hub_utils
 from tqdm import auto as tqdm_lib
@@ -55,6 +57,15 @@ _lock = threading.Lock()
 # SysLogHandler：ログをsyslogに送信するためのハンドラ。
 
 _default_handler: Optional[logging.Handler] = None
+# 非同期モード（TRANSFORMERS_ASYNC_LOG=1）で sys.stderr への書き込みを別スレッドで行うリスナー
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+# トップレベルパッケージ名はインポート時に一度だけ計算する
+_LIBRARY_NAME = __name__.split(".")[0]
+# _configure_library_root_logger で取得したルートロガーを保持し、毎回の logging.getLogger 呼び出しを避ける
+_ROOT_LOGGER: Optional[logging.Logger] = None
+# get_logger で取得したロガーを名前ごとに保持し、2回目以降の設定確認と logging.getLogger を省く
+_LOGGER_CACHE: Dict[str, logging.Logger] = {}
 
 
 log_levels = {
@@ -73,6 +84,16 @@ _default_log_level = logging.WARNING
 
 _tqdm_active = not hf_hub_utils.are_progress_bars_disabled()
 
+# 呼び出しごとの os.getenv を避けるため、環境変数はインポート時に一度だけ読み取る
+_ENV_VERBOSITY = os.getenv("TRANSFORMERS_VERBOSITY", None)
+_ENV_DETAIL = _ENV_VERBOSITY == "detail"
+_ENV_NO_ADVISORY = bool(os.getenv("TRANSFORMERS_NO_ADVISORY_WARNINGS", False))
+_ENV_ASYNC_LOG = os.getenv("TRANSFORMERS_ASYNC_LOG", None) == "1"
+
+# フォーマッターは呼び出しごとに生成せず、モジュール全体で共有する
+_EXPLICIT_FORMATTER = logging.Formatter("[%(levelname)s|%(filename)s:%(lineno)s] %(asctime)s >> %(message)s")
+_DETAIL_FORMATTER = logging.Formatter("[%(levelname)s|%(pathname)s:%(lineno)s] %(asctime)s >> %(message)s")
+
 
 def _get_default_logging_level():
     """
@@ -84,7 +105,7 @@ def _get_default_logging_level():
         int: ログレベル
     """
     # 環境変数が設定されていない場合、デフォルト値 None を返す
-    env_level_str = os.getenv("TRANSFORMERS_VERBOSITY", None)
+    env_level_str = _ENV_VERBOSITY
     if env_level_str:
         # 環境変数の値が log_levels に含まれている場合、その値を返す
         if env_level_str in log_levels:
@@ -107,7 +128,7 @@ def _get_library_name() -> str:
         __main__を返す
 
     """
-    return __name__.split(".")[0]
+    return _LIBRARY_NAME
 
 
 def _get_library_root_logger() -> logging.Logger:
@@ -119,37 +140,105 @@ def _get_library_root_logger() -> logging.Logger:
         __name__は "__main__" となるため、logging.getLogger("__main__")のようにしてロガーを取得する
     """
     # logging.getLogger(name):指定した名前（name）のロガーを取得します。
-    return logging.getLogger(_get_library_name())
+    # 設定済みであればキャッシュしたロガーを返す
+    return _ROOT_LOGGER or logging.getLogger(_LIBRARY_NAME)
 
 
-def _configure_library_root_logger() -> None:
+def _restore_stream_handler() -> None:
+    """
+    非同期モードの QueueHandler を、新しく作成した同期の StreamHandler に差し替える
+    差し替え後のログはリスナーを経由せず、呼び出し元のスレッドで直接 sys.stderr に出力される
+    """
     global _default_handler
+    # キューに残ったログは QueueHandler で整形済みのため、リスナーの StreamHandler にはフォーマッターを設定せず、
+    # 同期出力用には別の StreamHandler を用意する
+    stream_handler = logging.StreamHandler()
+    queue_handler = _default_handler
+    if queue_handler is not None:
+        # enable_explicit_format などで QueueHandler に設定されたフォーマッターを引き継ぐ
+        stream_handler.setFormatter(queue_handler.formatter)
+        # captureWarnings で py.warnings ロガーにも追加されている場合があるため、両方を差し替える
+        for logger in (_get_library_root_logger(), logging.getLogger("py.warnings")):
+            if queue_handler in logger.handlers:
+                logger.removeHandler(queue_handler)
+                logger.addHandler(stream_handler)
+    _default_handler = stream_handler
+
+
+def _stop_queue_listener() -> None:
+    """
+    非同期モードのリスナーを停止し、キューに残っているログをすべて出力する
+    停止後もログが失われないよう、先に同期の StreamHandler へ差し替えてから停止する
+    """
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    listener = _queue_listener
+    _queue_listener = None
+    _restore_stream_handler()
+    listener.stop()
+
+
+def _after_fork_in_child() -> None:
+    """
+    fork した子プロセスにはリスナーのスレッドが引き継がれず、キューが読み出されなくなるため、
+    子プロセスでは同期の StreamHandler に戻す
+    """
+    global _lock, _queue_listener
+    # fork 時に他のスレッドが保持していたロックは子プロセスで解放されないため作り直す
+    _lock = threading.Lock()
+    if _queue_listener is None:
+        return
+    # 子プロセスにスレッドは存在しないため、listener.stop() は呼ばない
+    _queue_listener = None
+    _restore_stream_handler()
+
+
+if _ENV_ASYNC_LOG:
+    # 終了時にキューに残ったログを出力してからリスナーを停止する
+    atexit.register(_stop_queue_listener)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _configure_library_root_logger() -> None:
+    global _default_handler, _ROOT_LOGGER, _queue_listener
+    # 初期化済みであればロックを取らずに戻る（GIL 下ではモジュールグローバルの読み取りはアトミック）
+    if _default_handler is not None:
+        return
     # 複数のスレッドがこの関数を同時に実行してロガー設定を変更することを防ぐ
     with _lock:
-        # ライブラリのルートロガーがすでに設定されている場合
-        if _default_handler:
+        # ロック待ちの間に他のスレッドが設定を済ませている場合
+        if _default_handler is not None:
             return
-        # StreamHandler を使用してデフォルトのログ出力先を sys.stderr に設定
-        _default_handler = logging.StreamHandler()
         # sys.stderr が None の場合、os.devnull を開いて出力先を設定
         if sys.stderr is None:
             sys.stderr = open(os.devnull, "w")
-        # ログの出力を即時反映させるために、sys.stderr の flush メソッドをハンドラーに関連付ける
-        _default_handler.flush = sys.stderr.flush
+        # StreamHandler を使用してデフォルトのログ出力先を sys.stderr に設定
+        # StreamHandler は出力のたびに自身の stream を flush するため、flush の差し替えは不要
+        # ロック外の読み取りが設定途中のハンドラーを見ないよう、グローバルへの代入は最後に行う
+        handler = logging.StreamHandler()
+        if _ENV_ASYNC_LOG:
+            # 呼び出し側はキューへの追加のみを行い、sys.stderr への書き込みはリスナーのスレッドで行う
+            log_queue = queue.Queue(-1)
+            _queue_listener = logging.handlers.QueueListener(log_queue, handler)
+            _queue_listener.start()
+            handler = logging.handlers.QueueHandler(log_queue)
 
         # ルートロガーの取得
-        library_root_logger = _get_library_root_logger()
+        _ROOT_LOGGER = logging.getLogger(_LIBRARY_NAME)
+        library_root_logger = _ROOT_LOGGER
         # ハンドラーをルートロガーに追加
-        library_root_logger.addHandler(_default_handler)
+        library_root_logger.addHandler(handler)
         # ルートロガーのレベルを設定
         library_root_logger.setLevel(_get_default_logging_level())
         # if logging level is debug, we add pathname and lineno to formatter for easy debugging
-        if os.getenv("TRANSFORMERS_VERBOSITY", None) == "detail":
-            formatter = logging.Formatter("[%(levelname)s|%(pathname)s:%(lineno)s] %(asctime)s >> %(message)s")
-            _default_handler.setFormatter(formatter)
+        if _ENV_DETAIL:
+            handler.setFormatter(_DETAIL_FORMATTER)
         # ログが親ロガーに伝播するのを防ぐ
         # これにより、ライブラリ固有のログ設定が外部の設定に影響を受けなくなる
         library_root_logger.propagate = False
+        _default_handler = handler
 
 
 def _reset_library_root_logger() -> None:
@@ -159,10 +248,14 @@ def _reset_library_root_logger() -> None:
         if not _default_handler:
             return
 
+        # 非同期モードの場合はリスナーを停止し、_default_handler を StreamHandler に戻してから取り外す
+        _stop_queue_listener()
         library_root_logger = _get_library_root_logger()
         library_root_logger.removeHandler(_default_handler)
         library_root_logger.setLevel(logging.NOTSET)
         _default_handler = None
+        # 次の get_logger 呼び出しで再度設定が行われるようにキャッシュを破棄する
+        _LOGGER_CACHE.clear()
 
 
 def get_log_levels_dict():
@@ -192,10 +285,16 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
 
     if name is None:
-        name = _get_library_name()
+        name = _LIBRARY_NAME
+
+    logger = _LOGGER_CACHE.get(name)
+    if logger is not None:
+        return logger
 
     _configure_library_root_logger()
-    return logging.getLogger(name)
+    logger = logging.getLogger(name)
+    _LOGGER_CACHE[name] = logger
+    return logger
 
 
 def get_verbosity() -> int:
@@ -265,7 +364,8 @@ def disable_default_handler() -> None:
 
     _configure_library_root_logger()
 
-    assert _default_handler is not None
+    if _default_handler is None:
+        raise ValueError("The default handler has not been configured.")
     _get_library_root_logger().removeHandler(_default_handler)
 
 
@@ -274,7 +374,8 @@ def enable_default_handler() -> None:
 
     _configure_library_root_logger()
 
-    assert _default_handler is not None
+    if _default_handler is None:
+        raise ValueError("The default handler has not been configured.")
     _get_library_root_logger().addHandler(_default_handler)
 
 
@@ -283,7 +384,8 @@ def add_handler(handler: logging.Handler) -> None:
 
     _configure_library_root_logger()
 
-    assert handler is not None
+    if handler is None:
+        raise ValueError("`handler` must not be None.")
     _get_library_root_logger().addHandler(handler)
 
 
@@ -292,8 +394,12 @@ def remove_handler(handler: logging.Handler) -> None:
 
     _configure_library_root_logger()
 
-    assert handler is not None and handler not in _get_library_root_logger().handlers
-    _get_library_root_logger().removeHandler(handler)
+    if handler is None:
+        raise ValueError("`handler` must not be None.")
+    library_root_logger = _get_library_root_logger()
+    if handler not in library_root_logger.handlers:
+        raise ValueError(f"{handler} is not attached to the library root logger.")
+    library_root_logger.removeHandler(handler)
 
 
 def disable_propagation() -> None:
@@ -326,8 +432,7 @@ def enable_explicit_format() -> None:
     handlers = _get_library_root_logger().handlers
 
     for handler in handlers:
-        formatter = logging.Formatter("[%(levelname)s|%(filename)s:%(lineno)s] %(asctime)s >> %(message)s")
-        handler.setFormatter(formatter)
+        handler.setFormatter(_EXPLICIT_FORMATTER)
 
 
 def reset_format() -> None:
@@ -347,8 +452,7 @@ def warning_advice(self, *args, **kwargs):
     This method is identical to `logger.warning()`, but if env var TRANSFORMERS_NO_ADVISORY_WARNINGS=1 is set, this
     warning will not be printed
     """
-    no_advisory_warnings = os.getenv("TRANSFORMERS_NO_ADVISORY_WARNINGS", False)
-    if no_advisory_warnings:
+    if _ENV_NO_ADVISORY or not self.isEnabledFor(WARNING):
         return
     self.warning(*args, **kwargs)
 
@@ -356,7 +460,11 @@ def warning_advice(self, *args, **kwargs):
 logging.Logger.warning_advice = warning_advice
 
 
-@functools.lru_cache(None)
+# warning_once / info_once で出力済みの (ロガー, 引数) を記録する集合
+_warned_once = set()
+_infoed_once = set()
+
+
 def warning_once(self, *args, **kwargs):
     """
     This method is identical to `logger.warning()`, but will emit the warning with the same message only once
@@ -365,13 +473,19 @@ def warning_once(self, *args, **kwargs):
     The assumption here is that all warning messages are unique across the code. If they aren't then need to switch to
     another type of cache that includes the caller frame information in the hashing function.
     """
+    # 出力されないレベルであればキーの生成・ハッシュ計算を行わない
+    if not self.isEnabledFor(WARNING):
+        return
+    key = (id(self), args, tuple(sorted(kwargs.items())))
+    if key in _warned_once:
+        return
+    _warned_once.add(key)
     self.warning(*args, **kwargs)
 
 
 logging.Logger.warning_once = warning_once
 
 
-@functools.lru_cache(None)
 def info_once(self, *args, **kwargs):
     """
     This method is identical to `logger.info()`, but will emit the info with the same message only once
@@ -380,6 +494,12 @@ def info_once(self, *args, **kwargs):
     The assumption here is that all warning messages are unique across the code. If they aren't then need to switch to
     another type of cache that includes the caller frame information in the hashing function.
     """
+    if not self.isEnabledFor(INFO):
+        return
+    key = (id(self), args, tuple(sorted(kwargs.items())))
+    if key in _infoed_once:
+        return
+    _infoed_once.add(key)
     self.info(*args, **kwargs)
 
 
@@ -389,6 +509,17 @@ logging.Logger.info_once = info_once
 class EmptyTqdm:
     """Dummy tqdm which doesn't do anything."""
 
+    # 属性アクセスのたびに関数を生成しないよう、共有の空関数を一つだけ用意する
+    _EMPTY_FN = staticmethod(lambda *args, **kwargs: None)
+
+    # よく使われるメソッドはクラス属性として定義し、__getattr__ を経由させない
+    update = _EMPTY_FN
+    set_description = _EMPTY_FN
+    set_postfix = _EMPTY_FN
+    close = _EMPTY_FN
+    refresh = _EMPTY_FN
+    write = _EMPTY_FN
+
     def __init__(self, *args, **kwargs):  # pylint: disable=unused-argument
         self._iterator = args[0] if args else None
 
@@ -397,11 +528,7 @@ class EmptyTqdm:
 
     def __getattr__(self, _):
         """Return empty function."""
-
-        def empty_fn(*args, **kwargs):  # pylint: disable=unused-argument
-            return
-
-        return empty_fn
+        return EmptyTqdm._EMPTY_FN
 
     def __enter__(self):
         return self
@@ -409,25 +536,17 @@ class EmptyTqdm:
     def __exit__(self, type_, value, traceback):
         return
 
+    @classmethod
+    def set_lock(cls, *args, **kwargs):  # pylint: disable=unused-argument
+        return
 
-class _tqdm_cls:
-    def __call__(self, *args, **kwargs):
-        if _tqdm_active:
-            return tqdm_lib.tqdm(*args, **kwargs)
-        else:
-            return EmptyTqdm(*args, **kwargs)
-
-    def set_lock(self, *args, **kwargs):
-        self._lock = None
-        if _tqdm_active:
-            return tqdm_lib.tqdm.set_lock(*args, **kwargs)
-
-    def get_lock(self):
-        if _tqdm_active:
-            return tqdm_lib.tqdm.get_lock()
+    @classmethod
+    def get_lock(cls):
+        return
 
 
-tqdm = _tqdm_cls()
+# 呼び出しごとに _tqdm_active を判定しないよう、有効/無効の切り替え時に tqdm を差し替える
+tqdm = tqdm_lib.tqdm if _tqdm_active else EmptyTqdm
 
 
 def is_progress_bar_enabled() -> bool:
@@ -438,13 +557,15 @@ def is_progress_bar_enabled() -> bool:
 
 def enable_progress_bar():
     """Enable tqdm progress bar."""
-    global _tqdm_active
+    global _tqdm_active, tqdm
     _tqdm_active = True
+    tqdm = tqdm_lib.tqdm
     hf_hub_utils.enable_progress_bars()
 
 
 def disable_progress_bar():
     """Disable tqdm progress bar."""
-    global _tqdm_active
+    global _tqdm_active, tqdm
     _tqdm_active = False
+    tqdm = EmptyTqdm
     hf_hub_utils.disable_progress_bars()
\ No newline at end of file
@@ -1,24 +1,32 @@
-import torch
+import pytest
+
+torch = pytest.importorskip("torch")
+
+# Probe the driver once for the whole module instead of once per test.
+_CUDA_OK = torch.cuda.is_available()
+
+if not _CUDA_OK:
+    pytest.skip("CUDA unavailable", allow_module_level=True)
+
+_DEV_COUNT = torch.cuda.device_count()
+_DEV_ID = torch.cuda.current_device()
+_DEV_NAME = torch.cuda.get_device_name(_DEV_ID)
+
 
 class TestCudaAvailability:
     """Test suite to check CUDA availability in PyTorch."""
 
-    def test_cuda_is_available(self):
-        """Test if CUDA is available."""
-        assert torch.cuda.is_available(), "CUDA is not available on this system."
+    def test_tensor_on_current_device(self):
+        """Test that a tensor can be allocated and computed on the current CUDA device."""
+        tensor = torch.ones(4, device=torch.device("cuda", _DEV_ID))
+        assert tensor.is_cuda and tensor.device.index == _DEV_ID, "Tensor was not placed on the CUDA device."
+        assert tensor.sum().item() == 4, "Computation on the CUDA device returned a wrong result."
 
     def test_cuda_device_count(self):
         """Test the number of CUDA devices."""
-        if torch.cuda.is_available():
-            device_count = torch.cuda.device_count()
-            assert device_count > 0, "No CUDA devices found."
-        else:
-            assert True, "Test skipped because CUDA is not available."
+        assert _DEV_COUNT > 0, "No CUDA devices found."
 
     def test_current_device_name(self):
         """Test the name of the current CUDA device."""
-        if torch.cuda.is_available():
-            device_name = torch.cuda.get_device_name(torch.cuda.current_device())
-            assert isinstance(device_name, str) and len(device_name) > 0, "Device name is not valid."
-        else:
-            assert True, "Test skipped because CUDA is not available."
+        assert 0 <= _DEV_ID < _DEV_COUNT, "Current device index is out of range."
+        assert isinstance(_DEV_NAME, str) and len(_DEV_NAME) > 0, "Device name is not valid."
@@ -0,0 +1,233 @@
+import logging
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# src/utils/logging.py imports both at module scope.
+pytest.importorskip("huggingface_hub")
+pytest.importorskip("tqdm")
+
+from src.utils import logging as library_logging  # noqa: E402
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _ListHandler(logging.Handler):
+    """Handler that keeps the formatted messages it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def captured():
+    """Collect messages reaching the library root logger and restore its verbosity afterwards."""
+    handler = _ListHandler()
+    verbosity = library_logging.get_verbosity()
+    library_logging.add_handler(handler)
+    yield handler.messages
+    library_logging.remove_handler(handler)
+    library_logging.set_verbosity(verbosity)
+
+
+def _run_async(script, **env_vars):
+    """Run `script` in a fresh interpreter with TRANSFORMERS_ASYNC_LOG=1, since the env vars are read at import."""
+    env = dict(os.environ, TRANSFORMERS_ASYNC_LOG="1", **env_vars)
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)],
+        cwd=_REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+class TestAsyncLogging:
+    """Test suite for the TRANSFORMERS_ASYNC_LOG queue-based default handler."""
+
+    def test_queued_records_reach_stderr(self):
+        """Test that records go through the QueueHandler and are written by the listener thread."""
+        result = _run_async(
+            """
+            from src.utils import logging
+
+            logger = logging.get_logger("src.test")
+            assert type(logging._default_handler).__name__ == "QueueHandler"
+            assert logging._queue_listener._thread.is_alive()
+            logger.warning("queued record")
+            logging._stop_queue_listener()
+            """
+        )
+        assert result.returncode == 0, result.stderr
+        assert "queued record" in result.stderr
+
+    def test_reset_stops_listener_thread(self):
+        """Test that resetting the library root logger stops the listener thread and formats queued records once."""
+        result = _run_async(
+            """
+            from src.utils import logging
+
+            logger = logging.get_logger("src.test")
+            logging.enable_explicit_format()
+            thread = logging._queue_listener._thread
+            logger.warning("before reset")
+            logging._reset_library_root_logger()
+            assert not thread.is_alive()
+            assert logging._queue_listener is None
+            assert logging._default_handler is None
+            """
+        )
+        assert result.returncode == 0, result.stderr
+        (line,) = result.stderr.splitlines()
+        assert line.count(" >> ") == 1 and line.endswith(" >> before reset")
+
+    def test_exit_flushes_queue(self):
+        """Test that queued records, and records logged by later atexit hooks, are written once formatted at exit."""
+        result = _run_async(
+            """
+            import atexit
+
+            # Registered before the library, so it runs after the library's own atexit hook.
+            atexit.register(lambda: logger.warning("logged after stop"))
+
+            from src.utils import logging
+
+            logger = logging.get_logger("src.test")
+            for i in range(1000):
+                logger.warning("record %d", i)
+            """,
+            TRANSFORMERS_VERBOSITY="detail",
+        )
+        assert result.returncode == 0, result.stderr
+        lines = result.stderr.splitlines()
+        # Every line carries exactly one "[LEVEL|path:line] time >> " prefix.
+        assert all(line.startswith("[WARNING|") and line.count(" >> ") == 1 for line in lines)
+        messages = [line.split(" >> ", 1)[1] for line in lines]
+        assert messages == [f"record {i}" for i in range(1000)] + ["logged after stop"]
+
+    @pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="fork is unavailable")
+    def test_forked_child_logs(self):
+        """Test that a child forked after configuration still writes its records."""
+        result = _run_async(
+            """
+            import multiprocessing
+            from src.utils import logging
+
+            logger = logging.get_logger("src.test")
+            logger.warning("from parent")
+
+            def child():
+                logger.warning("from child")
+
+            process = multiprocessing.get_context("fork").Process(target=child)
+            process.start()
+            process.join()
+            assert process.exitcode == 0
+            """
+        )
+        assert result.returncode == 0, result.stderr
+        assert "from parent" in result.stderr
+        assert "from child" in result.stderr
+
+
+class TestHandlerApi:
+    """Test suite for adding and removing handlers on the library root logger."""
+
+    def test_remove_attached_handler(self):
+        """Test that an attached handler can be removed."""
+        handler = _ListHandler()
+        library_logging.add_handler(handler)
+        assert handler in library_logging._get_library_root_logger().handlers
+        library_logging.remove_handler(handler)
+        assert handler not in library_logging._get_library_root_logger().handlers
+
+    def test_remove_unattached_handler_raises(self):
+        """Test that removing a handler that is not attached raises ValueError."""
+        with pytest.raises(ValueError):
+            library_logging.remove_handler(_ListHandler())
+
+    def test_add_none_handler_raises(self):
+        """Test that adding None as a handler raises ValueError."""
+        with pytest.raises(ValueError):
+            library_logging.add_handler(None)
+
+
+class TestOnceWarnings:
+    """Test suite for the logger.warning_once / logger.info_once deduplication."""
+
+    def test_warning_once_prints_once(self, captured):
+        """Test that the same warning is emitted only once per logger."""
+        logger = library_logging.get_logger("src.test_once")
+        library_logging.set_verbosity_warning()
+        for _ in range(3):
+            logger.warning_once("duplicated %s", "warning")
+        assert captured == ["duplicated warning"]
+
+    def test_info_once_prints_once(self, captured):
+        """Test that the same info message is emitted only once per logger."""
+        logger = library_logging.get_logger("src.test_once")
+        library_logging.set_verbosity_info()
+        for _ in range(3):
+            logger.info_once("duplicated info")
+        assert captured == ["duplicated info"]
+
+    def test_once_is_keyed_by_logger_and_arguments(self, captured):
+        """Test that different loggers or arguments are deduplicated separately."""
+        first = library_logging.get_logger("src.test_once.first")
+        second = library_logging.get_logger("src.test_once.second")
+        library_logging.set_verbosity_warning()
+        first.warning_once("keyed %s", "a")
+        second.warning_once("keyed %s", "a")
+        first.warning_once("keyed %s", "b")
+        first.warning_once("keyed %s", "a", stacklevel=2)
+        first.warning_once("keyed %s", "a")
+        assert captured == ["keyed a", "keyed a", "keyed b", "keyed a"]
+
+    def test_warning_once_below_level_is_not_recorded(self, captured):
+        """Test that a suppressed warning_once prints nothing and still prints once the level allows it."""
+        logger = library_logging.get_logger("src.test_once")
+        library_logging.set_verbosity_error()
+        logger.warning_once("gated warning")
+        assert captured == []
+        library_logging.set_verbosity_warning()
+        logger.warning_once("gated warning")
+        logger.warning_once("gated warning")
+        assert captured == ["gated warning"]
+
+    def test_info_once_below_level_is_not_recorded(self, captured):
+        """Test that a suppressed info_once prints nothing and still prints once the level allows it."""
+        logger = library_logging.get_logger("src.test_once")
+        library_logging.set_verbosity_warning()
+        logger.info_once("gated info")
+        assert captured == []
+        library_logging.set_verbosity_info()
+        logger.info_once("gated info")
+        logger.info_once("gated info")
+        assert captured == ["gated info"]
+
+    def test_warning_advice_respects_level(self, captured, monkeypatch):
+        """Test that warning_advice prints nothing when WARNING is disabled and prints otherwise."""
+        monkeypatch.setattr(library_logging, "_ENV_NO_ADVISORY", False)
+        logger = library_logging.get_logger("src.test_once")
+        library_logging.set_verbosity_error()
+        logger.warning_advice("advice")
+        assert captured == []
+        library_logging.set_verbosity_warning()
+        logger.warning_advice("advice")
+        assert captured == ["advice"]
+
+    def test_warning_advice_disabled_by_env(self, captured, monkeypatch):
+        """Test that warning_advice prints nothing when TRANSFORMERS_NO_ADVISORY_WARNINGS is set."""
+        monkeypatch.setattr(library_logging, "_ENV_NO_ADVISORY", True)
+        logger = library_logging.get_logger("src.test_once")
+        library_logging.set_verbosity_warning()
+        logger.warning_advice("silenced advice")
+        assert captured == []